@@ -2,14 +2,25 @@
  * 🥾 b00t Multi-Agent Hive - pm2 Ecosystem
  * Specialized sub-agents with flashbacker context management
  * Captain: Main orchestrator
+ *
+ * Python deps (msgspec, watchdog) must be installed before starting:
+ *   pip3 install -r agents/requirements.txt
+ *
+ * 🤓 Workers run with -X frozen_modules=on to cut CPython startup cost
+ * on every pm2 restart. The specialist loop is also PyPy-compatible
+ * (msgspec/watchdog ship PyPy wheels) - switch interpreter to 'pypy3'
+ * to JIT the poll/drain loop on hosts where PyPy is installed.
  */
 
+const PY_ARGS = '-X frozen_modules=on';
+
 module.exports = {
   apps: [
     {
       name: 'captain',
       script: './agents/scripts/captain.py',
       interpreter: 'python3',
+      interpreter_args: PY_ARGS,
       instances: 1,
       autorestart: true,
       watch: false,
@@ -26,6 +37,7 @@ module.exports = {
       name: 'architect-agent',
       script: './agents/scripts/specialist_agent.py',
       interpreter: 'python3',
+      interpreter_args: PY_ARGS,
       instances: 1,
       autorestart: true,
       max_memory_restart: '800M',
@@ -41,6 +53,7 @@ module.exports = {
       name: 'database-agent',
       script: './agents/scripts/specialist_agent.py',
       interpreter: 'python3',
+      interpreter_args: PY_ARGS,
       instances: 1,
       autorestart: true,
       max_memory_restart: '800M',
@@ -56,6 +69,7 @@ module.exports = {
       name: 'rust-expert',
       script: './agents/scripts/specialist_agent.py',
       interpreter: 'python3',
+      interpreter_args: PY_ARGS,
       instances: 1,
       autorestart: true,
       max_memory_restart: '800M',
@@ -71,6 +85,7 @@ module.exports = {
       name: 'devops-agent',
       script: './agents/scripts/specialist_agent.py',
       interpreter: 'python3',
+      interpreter_args: PY_ARGS,
       instances: 1,
       autorestart: true,
       max_memory_restart: '800M',
@@ -86,6 +101,7 @@ module.exports = {
       name: 'qa-agent',
       script: './agents/scripts/specialist_agent.py',
       interpreter: 'python3',
+      interpreter_args: PY_ARGS,
       instances: 1,
       autorestart: true,
       max_memory_restart: '600M',
@@ -101,6 +117,7 @@ module.exports = {
       name: 'security-agent',
       script: './agents/scripts/specialist_agent.py',
       interpreter: 'python3',
+      interpreter_args: PY_ARGS,
       instances: 1,
       autorestart: true,
       max_memory_restart: '600M',
@@ -116,6 +133,7 @@ module.exports = {
       name: 'api-designer',
       script: './agents/scripts/specialist_agent.py',
       interpreter: 'python3',
+      interpreter_args: PY_ARGS,
       instances: 1,
       autorestart: true,
       max_memory_restart: '600M',
@@ -126,14 +144,12 @@ module.exports = {
         FLASHBACKER_PERSONA: 'api-designer',
         B00T_ENABLED: 'true'
       }
-    }
-  ]
-};
-,
+    },
     {
       name: 'task-processor',
       script: './agents/scripts/task_processor.py',
       interpreter: 'python3',
+      interpreter_args: PY_ARGS,
       instances: 1,
       cron_restart: '*/5 * * * *',  // Run every 5 minutes
       autorestart: false,
@@ -141,3 +157,5 @@ module.exports = {
         TASK_MODE: 'ooda-loop'
       }
     }
+  ]
+};
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+🥾 Shared agent wire protocol
+msgspec-typed payloads for the captain ↔ specialist task queue
+"""
+
+import struct
+from pathlib import Path
+from typing import Any, Dict, List
+
+import msgspec
+
+# File queue the captain writes into and specialists watch
+TASK_DIR = Path("/tmp/agent_tasks")
+
+def task_log_path(role: str) -> Path:
+    """Append-only, length-prefixed msgpack task log for a role"""
+    return TASK_DIR / f"{role}.bin"
+
+class TaskPayload(msgspec.Struct):
+    """Task handed from captain to a specialist via the file queue"""
+    agent: str
+    task: str
+    context: Dict[str, Any] = {}
+    persona_context: str = ""
+    priority: int = 5
+
+class ResultPayload(msgspec.Struct):
+    """Result written back by a specialist after executing a task"""
+    agent_id: str
+    agent_role: str
+    task: str
+    status: str
+    output: Any = None
+    errors: List[str] = []
+
+# 🤓 Compile the msgspec state machines once at import - struct-typed
+# decoding is faster than untyped and validates payload shape for free
+encoder = msgspec.msgpack.Encoder()
+task_decoder = msgspec.msgpack.Decoder(TaskPayload)
+result_decoder = msgspec.msgpack.Decoder(ResultPayload)
+raw_decoder = msgspec.msgpack.Decoder()
+
+# For JSON boundaries (e.g. the flashback CLI) - parses bytes directly,
+# no intermediate str decode
+json_encoder = msgspec.json.Encoder()
+json_decoder = msgspec.json.Decoder()
+
+# Unix socket bus the captain listens on for specialist results
+RESULT_BUS_PATH = "/tmp/agent_bus.sock"
+
+# Stream framing: 4-byte big-endian length header, then msgpack body
+
+def pack_frame(body: bytes) -> bytes:
+    """Length-prefix a msgpack body for stream transports"""
+    return struct.pack(">I", len(body)) + body
+
+def read_exact(stream, n: int) -> bytes:
+    """Read exactly n bytes from a blocking stream"""
+    buf = b""
+    while len(buf) < n:
+        chunk = stream.read(n - len(buf))
+        if not chunk:
+            raise EOFError("stream closed mid-frame")
+        buf += chunk
+    return buf
+
+def read_frame(stream) -> bytes:
+    """Read one length-prefixed frame body from a blocking stream"""
+    (length,) = struct.unpack(">I", read_exact(stream, 4))
+    return read_exact(stream, length)
+
+def iter_frames(data: bytes):
+    """Yield complete frame bodies from a length-prefixed buffer (e.g. a
+    task log). A trailing partial frame - a torn write - is not yielded;
+    the consumer decides whether to keep or drop the tail"""
+    off = 0
+    end = len(data)
+    while off + 4 <= end:
+        length = int.from_bytes(data[off:off + 4], "big")
+        if off + 4 + length > end:
+            break  # torn trailing frame - stop at the last complete one
+        yield data[off + 4:off + 4 + length]
+        off += 4 + length
@@ -7,69 +7,242 @@ Delegates to specialized sub-agents via MCP
 
 import os
 import sys
-import json
+import types
+import atexit
 import asyncio
+import hashlib
+import tomllib
+import functools
+import threading
 import subprocess
-from typing import Dict, List, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Mapping, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
-@dataclass
+from agent_protocol import (
+    RESULT_BUS_PATH, TASK_DIR, TaskPayload, encoder, raw_decoder,
+    result_decoder, json_encoder, json_decoder, pack_frame, read_frame,
+    task_log_path
+)
+import persona_cache
+
+def _run_flashback(args: Tuple[str, ...], input_data: Optional[bytes] = None) -> Tuple[int, bytes]:
+    """Run one flashback CLI invocation - module-level so it pickles into
+    the flashback worker process
+
+    🤓 stdout stays bytes: msgspec parses bytes directly, so skipping
+    subprocess's text mode saves a full UTF-8 decode pass and a str copy
+    """
+    result = subprocess.run(
+        list(args),
+        input=input_data,
+        capture_output=True
+    )
+    return result.returncode, result.stdout
+
+class FlashbackDaemon:
+    """🥾 Long-lived flashback child speaking length-prefixed msgpack over stdio
+
+    Per-call subprocess.run pays full CLI startup for every save-session,
+    session-start and persona invocation. One persistent child amortizes
+    the spawn cost across all of them. If the installed CLI doesn't speak
+    `--server --stdio` yet the handshake fails and callers stay on the
+    per-call subprocess path.
+    """
+
+    def __init__(self, flashback_bin: str = "flashback"):
+        self.proc = None
+        # 🤓 One request/response in flight at a time: concurrent to_thread
+        # callers would otherwise interleave stdin writes and split each
+        # other's stdout frames mid-read
+        self._lock = threading.Lock()
+        try:
+            proc = subprocess.Popen(
+                [flashback_bin, "--server", "--stdio"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0
+            )
+        except Exception:
+            return
+        try:
+            # Handshake: the daemon must answer a ping before we trust it
+            reply = self._handshake(proc)
+            if reply.get("op") != "pong":
+                raise RuntimeError("unexpected handshake reply")
+            self.proc = proc
+        except Exception:
+            proc.kill()
+
+    def _handshake(self, proc, timeout: float = 5.0) -> Dict[str, Any]:
+        """Ping the child with a deadline
+
+        🤓 A child that accepts --server --stdio, swallows the ping and
+        never writes a frame would block read_frame forever and wedge
+        captain startup - so the roundtrip runs on a helper thread and
+        missing the deadline means kill + per-call fallback, the same
+        discipline close() applies to its wait()
+        """
+        replies: List[Dict[str, Any]] = []
+
+        def _ping():
+            try:
+                replies.append(self._roundtrip(proc, {"op": "ping"}))
+            except Exception:
+                pass  # no reply appended → treated as handshake failure
+
+        pinger = threading.Thread(target=_ping, daemon=True)
+        pinger.start()
+        pinger.join(timeout)
+        if not replies:
+            raise TimeoutError(f"no handshake reply within {timeout}s")
+        return replies[0]
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    @staticmethod
+    def _roundtrip(proc, request: Dict[str, Any]) -> Dict[str, Any]:
+        proc.stdin.write(pack_frame(encoder.encode(request)))
+        return raw_decoder.decode(read_frame(proc.stdout))
+
+    def rpc(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one request frame and block for its response frame"""
+        with self._lock:
+            return self._roundtrip(self.proc, request)
+
+    def close(self):
+        """Tell the child to exit and reap it"""
+        if self.alive:
+            try:
+                with self._lock:
+                    self.proc.stdin.write(pack_frame(encoder.encode({"op": "bye"})))
+                self.proc.wait(timeout=5)
+            except Exception:
+                self.proc.kill()
+        self.proc = None
+
+# 🤓 slots + frozen: ~40-50% smaller instances with C-level attribute
+# loads instead of __dict__ lookups, and safe to share read-only across
+# workflow runs. Context is a MappingProxyType so the shared tasks stay
+# immutable end to end.
+@dataclass(slots=True, frozen=True)
 class AgentTask:
     """Task to be delegated to specialist agent"""
     agent_role: str
     task_description: str
-    context: Dict[str, Any]
+    context: Mapping[str, Any]
     priority: int = 5
 
+# 🤓 Workflows are data, not code: task metadata lives in
+# workflows/{name}.toml and is parsed once per process (tomllib's C
+# parser) into a cached, priority-sorted tuple of AgentTasks
+@functools.cache
+def _load_workflow(name: str) -> tuple:
+    """Load a workflow's tasks from workflows/{name}.toml, pre-sorted"""
+    path = Path(__file__).with_name("workflows") / f"{name}.toml"
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    tasks = [
+        AgentTask(
+            agent_role=row["agent_role"],
+            task_description=row["task_description"],
+            context=types.MappingProxyType(row.get("context", {})),
+            priority=row.get("priority", 5)
+        )
+        for row in data.get("tasks", [])
+    ]
+    return tuple(sorted(tasks, key=lambda t: t.priority, reverse=True))
+
 class FlashbackerIntegration:
     """🥾 Flashbacker integration for context management"""
     
     def __init__(self):
         self.flashback_bin = "flashback"
-        
-    def save_session_context(self, context_data: Dict[str, Any]) -> bool:
+        # 🤓 One long-lived child amortizes CLI startup across all three
+        # subcommands; handshake failure leaves us on the per-call path
+        self.daemon = FlashbackDaemon(self.flashback_bin)
+        # 🤓 A dedicated single worker keeps blocking flashback children
+        # off the event loop, so a captain hosted under an outer loop
+        # (FastAPI/MCP) never stalls coroutines or shares loop state with
+        # the fork
+        self._pool = ProcessPoolExecutor(max_workers=1)
+        atexit.register(self._pool.shutdown)
+        # 🤓 Daemon persona replies memoized for the process lifetime, so
+        # pre-warming pays the pipe roundtrip once per persona regardless
+        # of which path serves it (persona_cache memoizes the fallback)
+        self._daemon_personas: Dict[str, str] = {}
+
+    def close(self):
+        """Shut down the persistent flashback child, if any"""
+        self.daemon.close()
+
+    async def _run_pooled(self, args: Tuple[str, ...],
+                          input_data: Optional[bytes] = None) -> Tuple[int, bytes]:
+        """Run a flashback CLI call in the isolated worker process"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _run_flashback, args, input_data)
+
+    async def save_session_context(self, context_data: Dict[str, Any]) -> bool:
         """Save session context using flashbacker"""
+        if self.daemon.alive:
+            try:
+                reply = await asyncio.to_thread(
+                    self.daemon.rpc, {"op": "save-session", "context": context_data}
+                )
+                return bool(reply.get("ok"))
+            except Exception as e:
+                print(f"⚠️ Flashback daemon save failed: {e}")
         try:
             # 🤓 Use flashbacker to reduce context usage
-            result = subprocess.run(
-                [self.flashback_bin, "save-session", "--context"],
-                input=json.dumps(context_data),
-                capture_output=True,
-                text=True
+            returncode, _ = await self._run_pooled(
+                (self.flashback_bin, "save-session", "--context"),
+                input_data=json_encoder.encode(context_data)
             )
-            return result.returncode == 0
+            return returncode == 0
         except Exception as e:
             print(f"⚠️ Flashbacker save failed: {e}")
             return False
-    
-    def load_session_context(self) -> Dict[str, Any]:
+
+    async def load_session_context(self) -> Dict[str, Any]:
         """Load session context from flashbacker"""
+        if self.daemon.alive:
+            try:
+                reply = await asyncio.to_thread(self.daemon.rpc, {"op": "session-start"})
+                return reply.get("context", {})
+            except Exception as e:
+                print(f"⚠️ Flashback daemon load failed: {e}")
         try:
-            result = subprocess.run(
-                [self.flashback_bin, "session-start"],
-                capture_output=True,
-                text=True
+            returncode, stdout = await self._run_pooled(
+                (self.flashback_bin, "session-start")
             )
-            if result.returncode == 0:
-                return json.loads(result.stdout)
+            if returncode == 0:
+                return json_decoder.decode(stdout)
             return {}
         except Exception as e:
             print(f"⚠️ Flashbacker load failed: {e}")
             return {}
-    
-    def get_persona_context(self, persona: str) -> str:
-        """Get flashbacker persona context"""
-        try:
-            result = subprocess.run(
-                [self.flashback_bin, "persona", persona, "--context"],
-                capture_output=True,
-                text=True
-            )
-            return result.stdout if result.returncode == 0 else ""
-        except Exception as e:
-            print(f"⚠️ Persona context failed: {e}")
-            return ""
+
+    async def get_persona_context(self, persona: str) -> str:
+        """Get flashbacker persona context (memoized per persona file)"""
+        if self.daemon.alive:
+            if persona in self._daemon_personas:
+                return self._daemon_personas[persona]
+            try:
+                reply = await asyncio.to_thread(
+                    self.daemon.rpc, {"op": "persona", "name": persona}
+                )
+                context = reply.get("context", "")
+                self._daemon_personas[persona] = context
+                return context
+            except Exception as e:
+                print(f"⚠️ Flashback daemon persona failed: {e}")
+        # The memoized path usually returns from memory; a cache miss
+        # forks in the worker thread, safely off the loop
+        return await asyncio.to_thread(persona_cache.get_persona_context, persona)
 
 class CaptainOrchestrator:
     """🎯 Captain agent - coordinates specialized sub-agents"""
@@ -79,116 +252,112 @@ class CaptainOrchestrator:
         self.flashbacker = FlashbackerIntegration()
         self.task_queue: List[AgentTask] = []
         self.agent_status: Dict[str, str] = {}
+        self.result_server = None
+        # 🤓 One mkdir at startup instead of a syscall per delegation
+        TASK_DIR.mkdir(parents=True, exist_ok=True)
+
+    async def start_result_bus(self):
+        """Listen for specialist results on the Unix socket bus
+
+        🤓 Streamed, length-prefixed msgpack results replace one file per
+        result: no disk IO, no directory scans, and no result polling.
+        Specialists that can't connect fall back to the results dir.
+        """
+        bus = Path(RESULT_BUS_PATH)
+        bus.unlink(missing_ok=True)
+        self.result_server = await asyncio.start_unix_server(
+            self._handle_result_client, path=RESULT_BUS_PATH
+        )
+
+    async def stop_result_bus(self):
+        """Stop listening and remove the bus socket"""
+        if self.result_server is not None:
+            self.result_server.close()
+            await self.result_server.wait_closed()
+            self.result_server = None
+        Path(RESULT_BUS_PATH).unlink(missing_ok=True)
+
+    async def _handle_result_client(self, reader, writer):
+        """Drain framed ResultPayloads from one specialist connection"""
+        try:
+            while True:
+                header = await reader.readexactly(4)
+                body = await reader.readexactly(int.from_bytes(header, "big"))
+                result = result_decoder.decode(body)
+                self.agent_status[result.agent_role] = result.status
+                print(f"📨 {result.agent_role} reported: {result.status}")
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
         
+    async def _build_task_file(self, task: AgentTask) -> tuple:
+        """Serialize a task into its queue file path + msgpack payload"""
+        # Get persona context from flashbacker, off the event-loop thread -
+        # it's a daemon pipe roundtrip or a subprocess fork underneath
+        persona_context = await self.flashbacker.get_persona_context(task.agent_role)
+
+        # 🤓 Use MCP-style communication (avoiding ACP for now)
+        task_payload = TaskPayload(
+            agent=task.agent_role,
+            task=task.task_description,
+            context=dict(task.context),  # msgspec needs a real dict on the wire
+            persona_context=persona_context,
+            priority=task.priority
+        )
+
+        return task_log_path(task.agent_role), encoder.encode(task_payload)
+
+    @staticmethod
+    def _append_task(task_log: Path, payload: bytes):
+        """Append one length-prefixed frame to a role's task log
+
+        🤓 A single unbuffered write keeps the frame contiguous under
+        O_APPEND, and specialists drain all queued frames in one read
+        instead of one file per task
+        """
+        with task_log.open("ab", buffering=0) as log:
+            log.write(pack_frame(payload))
+
     async def delegate_task(self, task: AgentTask) -> Dict[str, Any]:
         """Delegate task to specialist agent"""
         print(f"📋 Delegating to {task.agent_role}: {task.task_description}")
-        
-        # Get persona context from flashbacker
-        persona_context = self.flashbacker.get_persona_context(task.agent_role)
-        
-        # 🤓 Use MCP-style communication (avoiding ACP for now)
-        task_payload = {
-            "agent": task.agent_role,
-            "task": task.task_description,
-            "context": task.context,
-            "persona_context": persona_context,
-            "priority": task.priority
-        }
-        
-        # Save to task queue file for pm2 agents to pick up
-        task_file = Path(f"/tmp/agent_tasks/{task.agent_role}.json")
-        task_file.parent.mkdir(exist_ok=True)
-        task_file.write_text(json.dumps(task_payload, indent=2))
-        
+
+        task_log, payload = await self._build_task_file(task)
+        await asyncio.to_thread(self._append_task, task_log, payload)
+
         print(f"✅ Task delegated to {task.agent_role}")
-        return {"status": "delegated", "task_file": str(task_file)}
+        return {"status": "delegated", "task_file": str(task_log)}
     
     async def process_commercerack_migration(self):
         """Main workflow: CommerceRack Perl → Rust migration"""
         print("🦀 Starting CommerceRack migration workflow")
-        
-        # Define specialized tasks
-        tasks = [
-            AgentTask(
-                agent_role="architect",
-                task_description="Review Cargo workspace structure and recommend improvements",
-                context={
-                    "workspace_path": "commercerack-rust",
-                    "crates_count": 12,
-                    "focus": "modular architecture"
-                },
-                priority=10
-            ),
-            AgentTask(
-                agent_role="database-architect",
-                task_description="Complete Postgres schema migration for remaining 130 tables",
-                context={
-                    "schema_path": "migrations/001_initial_schema.sql",
-                    "remaining_tables": 130,
-                    "source": "/home/user/commercerack-backend/schema.sql"
-                },
-                priority=9
-            ),
-            AgentTask(
-                agent_role="rust-expert",
-                task_description="Translate CUSTOMER.pm to Rust customer crate",
-                context={
-                    "source_file": "/home/user/commercerack-backend/lib/CUSTOMER.pm",
-                    "target_crate": "crates/customer",
-                    "lines_of_code": 2579
-                },
-                priority=8
-            ),
-            AgentTask(
-                agent_role="devops",
-                task_description="Set up k0s cluster and deploy CommerceRack containers",
-                context={
-                    "terraform_path": "infra/k0s",
-                    "use_opentofu": True,
-                    "k0s_version": "latest"
-                },
-                priority=7
-            ),
-            AgentTask(
-                agent_role="qa",
-                task_description="Create integration test suite for database layer",
-                context={
-                    "test_path": "crates/db/tests",
-                    "framework": "cargo test",
-                    "coverage_target": 80
-                },
-                priority=6
-            ),
-            AgentTask(
-                agent_role="security",
-                task_description="Audit password hashing and authentication patterns",
-                context={
-                    "focus_areas": ["password_hashing", "session_management", "sql_injection"],
-                    "target": "crates/customer"
-                },
-                priority=8
-            ),
-            AgentTask(
-                agent_role="api-designer",
-                task_description="Design RESTful API schema for Axum server",
-                context={
-                    "endpoints": ["customers", "products", "orders", "cart"],
-                    "auth_type": "JWT",
-                    "api_version": "v1"
-                },
-                priority=7
-            )
-        ]
-        
-        # Delegate tasks in priority order
-        tasks.sort(key=lambda t: t.priority, reverse=True)
-        
-        for task in tasks:
-            result = await self.delegate_task(task)
-            print(f"  → {result}")
-            await asyncio.sleep(1)  # Stagger task delegation
-        
+
+        # 🤓 Warm persona contexts in parallel - through the integration,
+        # so whichever path delegation will hit (daemon rpc or fork
+        # fallback) is the one whose cache gets primed
+        tasks = _load_workflow("commercerack")
+        personas = {task.agent_role for task in tasks}
+        await asyncio.gather(
+            *(self.flashbacker.get_persona_context(p) for p in personas)
+        )
+
+        # 🤓 Fan out delegations concurrently: persona fetches and disk
+        # writes overlap across tasks, so wall time is the max task latency
+        # rather than the sum. The semaphore caps the fan-out, and the
+        # TaskGroup cancels siblings if any delegation blows up.
+        sem = asyncio.Semaphore(int(os.getenv("MAX_CONCURRENT_DELEGATES", "4")))
+
+        async def _delegate(task: AgentTask) -> Dict[str, Any]:
+            async with sem:
+                return await self.delegate_task(task)
+
+        async with asyncio.TaskGroup() as tg:
+            futures = [tg.create_task(_delegate(task)) for task in tasks]
+
+        for future in futures:
+            print(f"  → {future.result()}")
+
         print("\n✅ All tasks delegated to specialist agents")
         print("📊 Monitor with: pm2 logs")
     
@@ -199,10 +368,13 @@ class CaptainOrchestrator:
         print(f"💾 Flashbacker enabled: {os.getenv('FLASHBACKER_ENABLED')}")
         
         # Load previous context from flashbacker
-        prev_context = self.flashbacker.load_session_context()
+        prev_context = await self.flashbacker.load_session_context()
         if prev_context:
             print(f"📚 Loaded context from previous session: {len(prev_context)} items")
-        
+
+        # Accept specialist results over the bus while the workflow runs
+        await self.start_result_bus()
+
         # Execute main workflow
         await self.process_commercerack_migration()
         
@@ -211,10 +383,25 @@ class CaptainOrchestrator:
             "agent_id": self.agent_id,
             "tasks_delegated": len(self.task_queue),
             "workflow": "commercerack_migration",
-            "timestamp": "2025-11-17"
         }
-        self.flashbacker.save_session_context(session_context)
-        
+        # 🤓 Skip the save-session fork+exec entirely when nothing changed
+        # since the last run - digest excludes the timestamp, which would
+        # otherwise defeat the cache every time
+        digest = hashlib.blake2b(encoder.encode(session_context), digest_size=8).digest()
+        last_hash = Path("/tmp/flashback_last.hash")
+        session_context["timestamp"] = "2025-11-17"
+        if last_hash.exists() and last_hash.read_bytes() == digest:
+            print("💾 Session context unchanged - skipping save")
+        elif await self.flashbacker.save_session_context(session_context):
+            last_hash.write_bytes(digest)
+        self.flashbacker.close()
+        # 🤓 run() is one-shot: the bus goes down moments after the last
+        # task frame lands, so in the pm2 topology specialists usually
+        # find the socket gone and take the lossless file fallback. The
+        # bus only pays off when the captain stays resident - e.g. hosted
+        # under an outer loop serving MCP - and keeps this server up.
+        await self.stop_result_bus()
+
         print("\n🎯 Captain workflow complete. Agents working in background.")
         print("📋 Next: Monitor specialist agents with 'pm2 status' and 'pm2 logs'")
 
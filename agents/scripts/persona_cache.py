@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+🥾 Cached flashback persona lookups
+Persona output is deterministic per persona file, so memoize it instead
+of paying a fork+exec+CLI startup on every delegation and every task
+"""
+
+import os
+import time
+import functools
+import subprocess
+from pathlib import Path
+
+PERSONA_DIR = Path(".claude/flashback/personas")
+
+def _cache_key(persona: str) -> float:
+    """Invalidate on persona file change, or every 5 minutes when the
+    persona file isn't locatable from the working directory"""
+    try:
+        return os.path.getmtime(PERSONA_DIR / f"{persona}.md")
+    except OSError:
+        return time.time() // 300
+
+@functools.lru_cache(maxsize=64)
+def _persona(persona: str, cache_key: float) -> str:
+    # 🤓 Capture bytes and decode lazily - only successful output ever
+    # pays for the UTF-8 pass, and failures skip the copy entirely
+    result = subprocess.run(
+        ["flashback", "persona", persona, "--context"],
+        capture_output=True,
+        timeout=30
+    )
+    return result.stdout.decode("utf-8") if result.returncode == 0 else ""
+
+def get_persona_context(persona: str) -> str:
+    """Get flashback persona context - repeat lookups hit memory, not fork"""
+    try:
+        return _persona(persona, _cache_key(persona))
+    except Exception as e:
+        print(f"⚠️ Persona context failed: {e}")
+        return ""
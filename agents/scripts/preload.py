@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+🥾 Import warmer for agent workers
+Pre-imports the hot modules so the first task doesn't pay import cost.
+Point PYTHONSTARTUP here for interactive debugging, or import it first
+from ad-hoc driver scripts. Verify with: python -X importtime
+"""
+
+import os          # noqa: F401
+import asyncio     # noqa: F401
+import pathlib     # noqa: F401
+
+import msgspec     # noqa: F401
+
+import agent_protocol  # noqa: F401
+import persona_cache   # noqa: F401
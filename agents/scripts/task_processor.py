@@ -3,8 +3,9 @@
 import json
 from pathlib import Path
 
+from agent_protocol import TASK_DIR, TaskPayload, encoder, pack_frame, task_log_path
+
 TASKS_FILE = Path("tasks.jsonl")
-AGENT_TASKS = Path("/tmp/agent_tasks")
 
 def observe():
     """Observe: Load pending tasks"""
@@ -40,16 +41,17 @@ def decide(ready_tasks):
 
 def act(task_batch):
     """Act: Delegate to agents via file-based queue"""
-    AGENT_TASKS.mkdir(exist_ok=True)
+    TASK_DIR.mkdir(exist_ok=True)
     
     for task in task_batch:
         agent = task.get("agent", "architect")
-        task_file = AGENT_TASKS / f"{agent}.json"
-        task_file.write_text(json.dumps({
-            "task_id": task["id"],
-            "task": task["task"],
-            "phase": task["phase"]
-        }, indent=2))
+        payload = encoder.encode(TaskPayload(
+            agent=agent,
+            task=task["task"],
+            context={"task_id": task["id"], "phase": task["phase"]}
+        ))
+        with task_log_path(agent).open("ab", buffering=0) as log:
+            log.write(pack_frame(payload))
         print(f"✅ Delegated {task['id']} to {agent}: {task['task']}")
 
 def main():